@@ -1 +1 @@
-from pyGOBN import GOBN
\ No newline at end of file
+from .pyGOBN import GOBN
\ No newline at end of file
@@ -37,15 +37,267 @@ distribute, respectively.
 """
 __author__ = """Nicholas Cullen <ncullen.th@dartmouth.edu>"""
 
+import codecs
+import collections
+import concurrent.futures
+import hashlib
+import itertools
+import json
+import logging
+import math
 import os
+import shlex
+import shutil
 import subprocess
+import tarfile
 import time
 import sys
 import re
+import select
 
 import numpy as np
 import pandas as pd
 
+try:
+	import fcntl
+except ImportError:
+	fcntl = None # not on Windows
+
+try:
+	from zlib_ng import gzip_ng_threaded
+except ImportError:
+	gzip_ng_threaded = None
+
+try:
+	from numba import njit, prange
+except ImportError:
+	njit = None
+
+log = logging.getLogger(__name__)
+
+# how many solver outputs learn() keeps in memory / in CACHE_DIR
+_MEMORY_CACHE_SIZE = 128
+_DISK_CACHE_SIZE = 1024
+# how many bytes of a command's output execute() keeps around, unless
+# the caller needs all of it (capture=True)
+_OUTPUT_TAIL = 64 * 1024
+# requested kernel buffer size of execute()'s output pipe
+_PIPE_SIZE = 1024 * 1024
+# outcome of GOBNILP's configure.sh, searched for in its (bytes) output
+_CONFIG_RESULT = re.compile(rb'SUCCEEDED|exists')
+# one node of a learned BN in GOBNILP's output: "node<-pa1,pa2, score"
+_BN_LINE = re.compile(rb'^([^\s<]+)<-(\S*)\s+(-?[0-9][^\s]*)[ \t]*$', re.M)
+# tarfile's extraction filter which refuses absolute paths, links out of
+# the destination, device files, etc. (Python 3.12+ and security backports)
+_TAR_FILTER = {'filter': 'data'} if hasattr(tarfile, 'data_filter') else {}
+# a (possibly commented-out) line of the settings file: "path = value"
+_SETTING_LINE = re.compile(r'^(#?[ \t]*)([\w/]+)([ \t]*=[ \t]*)(.*)$')
+# an (uncommented) output file setting, with the file name as group 2
+_OUTPUT_FILE = re.compile(r'^(gobnilp/outputfile/\w+[ \t]*=[ \t]*")([^"\n]*)"', re.M)
+
+
+# short setting name -> full GOBNILP parameter path
+_SETTING_PATHS = {
+	'dagconstraintsfile': 'gobnilp/dagconstraintsfile',
+	'delimiter': 'gobnilp/delimiter',
+	'mergedelimiters': 'gobnilp/mergedelimiters',
+	'minfounders': 'gobnilp/minfounders',
+	'edge_penalty': 'gobnilp/edge_penalty',
+	'nbns': 'gobnilp/nbns',
+	'solution': 'gobnilp/outputfile/solution',
+	'adjacencymatrix': 'gobnilp/outputfile/adjacencymatrix',
+	'dot': 'gobnilp/outputfile/dot',
+	'scoreandtime': 'gobnilp/outputfile/scoreandtime',
+	'mec': 'gobnilp/outputfile/mec',
+	'pedigree': 'gobnilp/outputfile/pedigree',
+	'scores': 'gobnilp/outputfile/scores',
+	'alpha': 'gobnilp/scoring/alpha',
+	'arities': 'gobnilp/scoring/arities',
+	'names': 'gobnilp/scoring/names',
+	'palim': 'gobnilp/scoring/palim',
+	'prune': 'gobnilp/scoring/prune',
+	'fast': 'gobnilp/scoring/fast',
+	'probing': 'heuristics/sinks/probing',
+	'maxdivedepth': 'heuristics/sinks/maxdivedepth',
+	'time': 'limits/time',
+	'gap': 'limits/gap'}
+
+
+class _text(object):
+	"""
+	Wraps command output (bytes) so that it is only decoded if a
+	log message which includes it is actually emitted.
+	"""
+	__slots__ = ('output',)
+
+	def __init__(self, output):
+		self.output = output
+
+	def __str__(self):
+		return self.output.decode('utf-8', 'replace')
+
+
+def _setting_path(name):
+	"""
+	Return the full GOBNILP parameter path of a setting, which may be
+	given either by its short name (e.g. 'alpha') or by its full path
+	(e.g. 'gobnilp/scoring/alpha'). Returns None for unknown settings.
+	"""
+	if '/' in name:
+		return name
+	return _SETTING_PATHS.get(name)
+
+
+def _format_setting(value, quoted=None):
+	"""
+	Format a setting value the way GOBNILP expects it in the
+	settings file - booleans as TRUE/FALSE and strings quoted.
+	If *quoted* is given, it overrides whether the value is quoted.
+	"""
+	if isinstance(value, bool):
+		value = 'TRUE' if value else 'FALSE'
+	if quoted is None:
+		quoted = isinstance(value, str) and value.upper() not in ('TRUE', 'FALSE')
+	if quoted:
+		return '"%s"' % value
+	return str(value)
+
+
+def _hash_file(h, path):
+	"""
+	Feed the contents of the file at *path* into the hash object *h*,
+	1 MB at a time through one reused buffer.
+	"""
+	buf = bytearray(1 << 20)
+	view = memoryview(buf)
+	with open(path, 'rb', buffering=0) as f:
+		while True:
+			n = f.readinto(buf)
+			if not n:
+				break
+			h.update(view[:n])
+
+
+def _hash_array(h, data):
+	"""
+	Feed the values of the ndarray *data* into the hash object *h*,
+	1 MB at a time, without making a flat bytes copy of the array
+	(unless it is not contiguous). Object arrays (e.g. the values
+	of a mixed-type dataframe) hold pointers, so their values are
+	hashed as strings instead.
+	"""
+	if data.dtype.kind == 'O':
+		data = data.astype(str)
+	view = np.ascontiguousarray(data).reshape(-1).view(np.uint8)
+	for i in range(0, len(view), 1 << 20):
+		h.update(view[i:i + (1 << 20)])
+
+
+def _newest_mtime(root, exts=('.c', '.h', '.cpp', '.hpp')):
+	"""
+	Return the newest modification time of any file under *root*
+	with one of the extensions *exts* (0 if there are none).
+	"""
+	newest = 0
+	try:
+		entries = os.scandir(root)
+	except OSError:
+		return newest
+	with entries:
+		for entry in entries:
+			if entry.is_dir(follow_symlinks=False):
+				newest = max(newest, _newest_mtime(entry.path, exts))
+			elif entry.name.endswith(exts):
+				newest = max(newest, entry.stat().st_mtime)
+	return newest
+
+
+def _n_cpus():
+	"""
+	The number of cpus this process may run on. Unlike os.cpu_count()
+	this respects CPU affinity (e.g. taskset or container cpusets),
+	so parallel builds do not oversubscribe the cpus actually available.
+	"""
+	if hasattr(os, 'sched_getaffinity'):
+		return len(os.sched_getaffinity(0))
+	return os.cpu_count() or 1
+
+
+def _bdeu_score(counts, q, r, alpha):
+	"""
+	BDeu local score of a child with *r* states given a parent set
+	with *q* joint configurations, where *counts* is the flattened
+	(q x r) contingency table of parent configuration vs child state.
+	"""
+	a_j = alpha / q
+	a_jk = alpha / (q * r)
+	score = 0.0
+	for j in range(q):
+		n_j = 0
+		for k in range(r):
+			n = counts[j * r + k]
+			if n > 0:
+				score += math.lgamma(a_jk + n) - math.lgamma(a_jk)
+				n_j += n
+		if n_j > 0:
+			score += math.lgamma(a_j) - math.lgamma(a_j + n_j)
+	return score
+
+
+def _local_scores_kernel(data, arities, children, parents, alpha):
+	"""
+	BDeu score of every (child, parent set) pair. *parents* holds
+	one parent set per row, padded with -1.
+	"""
+	n_rows = data.shape[0]
+	scores = np.empty(children.shape[0])
+	for s in prange(children.shape[0]):
+		child = children[s]
+		r = arities[child]
+		q = 1
+		for p in parents[s]:
+			if p >= 0:
+				q *= arities[p]
+		counts = np.zeros(q * r, dtype=np.int64)
+		for i in range(n_rows):
+			cfg = 0
+			for p in parents[s]:
+				if p >= 0:
+					cfg = cfg * arities[p] + data[i, p]
+			counts[cfg * r + data[i, child]] += 1
+		scores[s] = _bdeu_score(counts, q, r, alpha)
+	return scores
+
+
+if njit is not None:
+	_bdeu_score = njit(cache=True)(_bdeu_score)
+	_local_scores_kernel = njit(parallel=True, cache=True)(_local_scores_kernel)
+
+
+class _Pkg(object):
+	"""
+	The paths and unpack/make state of one source package
+	(GOBNILP or SCIP).
+
+	Fields are stored in __slots__ so that a misspelled field
+	raises an AttributeError instead of silently creating a new
+	entry. Item access (e.g. gobn.GOBN['MADE']) is still supported
+	for backwards compatibility.
+	"""
+	__slots__ = ('dir', 'gobn_dir', 'scipopt_dir', 'scip_dir',
+		'tar_file', 'stamp_file', 'makefile', 'unpacked', 'made')
+
+	def __init__(self, **fields):
+		self.unpacked = False
+		self.made = False
+		for name, value in fields.items():
+			setattr(self, name, value)
+
+	def __getitem__(self, key):
+		return getattr(self, key.lower())
+
+	def __setitem__(self, key, value):
+		setattr(self, key.lower(), value)
 
 
 class GOBN(object):
@@ -125,7 +377,14 @@ class GOBN(object):
 
 
 	"""
-
+	# All state is in __slots__ (no per-instance __dict__), so a
+	# misspelled attribute raises an AttributeError.
+	__slots__ = ('GOBN_VERSION', 'SCIP_VERSION', 'GOBN', 'SCIP',
+		'SETTINGS_FILE', 'CONSTRAINTS_FILE', 'VERBOSE', 'DATA_DIR', 'LPS', 'CACHE_DIR',
+		'_scip_link_path', '_scip_exec_path',
+		'_gob_exec_path', '_gob_exec_ok', '_settings_lines', '_settings_index',
+		'_settings_dirty', '_settings_stat', '_pending_settings', '_last_settings',
+		'_setting_defaults', '_learn_cache')
 
 	def __init__(self,
 			GOBN_DIR, 
@@ -134,7 +393,9 @@ class GOBN(object):
 			SCIP_VERSION='3.1.1',
 			SETTINGS_FILE='mysettings.txt', 
 			CONSTRAINTS_FILE='myconstraints.txt',
-			VERBOSE=False):
+			VERBOSE=False,
+			use_fast_gamma=True,
+			CACHE_DIR=None):
 		"""
 		Arguments
 		---------
@@ -168,43 +429,82 @@ class GOBN(object):
 		*VERBOSE* : a boolean
 			Whether to have verbose output or not
 
-		"""
-		self.GOBN = {
-				'DIR': GOBN_DIR, # main directory
-				'GOBN_DIR': os.path.join(GOBN_DIR, 'gobnilp%s'%GOBN_VERSION), # main GOBNILP directory
-				'TAR_FILE' : os.path.join(GOBN_DIR,'gobnilp%s.tar.gz' % GOBN_VERSION),
-				'UNPACKED' : False,
-				'MADE' : False}
+		*use_fast_gamma* : a boolean
+			Whether GOBNILP scores with its fast (approximate) gamma
+			function unless told otherwise. Turn this off if scoring
+			is numerically unstable, e.g. for a large equivalent
+			sample size. Pruning during scoring is also used unless
+			told otherwise.
 
-		self.SCIP = {
-				'DIR' : SCIP_DIR, # main directory
-				'SCIPOPT_DIR' : os.path.join(SCIP_DIR, 'scipoptsuite-%s'%SCIP_VERSION),
-				'SCIP_DIR' : os.path.join(SCIP_DIR, 'scipoptsuite-%s'%SCIP_VERSION, 'scip-%s'%SCIP_VERSION),
-				'TAR_FILE' : os.path.join(SCIP_DIR, 'scipoptsuite-%s.tgz' % SCIP_VERSION),
-				'UNPACKED' : False,
-				'MADE' : False}
+		*CACHE_DIR* : a string (directory path) (Optional)
+			Where learn() keeps the output of its solver runs between
+			sessions (the most recent 1024 of them). By default the
+			output is only kept in memory.
+
+		"""
+		self.GOBN_VERSION = GOBN_VERSION
+		self.SCIP_VERSION = SCIP_VERSION
+		self.set_GOBN(GOBN_DIR)
+		self.set_SCIP(SCIP_DIR)
 
 		self.SETTINGS_FILE = SETTINGS_FILE
 		self.CONSTRAINTS_FILE = CONSTRAINTS_FILE
 		self.VERBOSE = VERBOSE
 		self.DATA_DIR = os.path.join(GOBN_DIR, 'data')
 
+		self._settings_lines = None # cached lines of SETTINGS_FILE
+		self._settings_index = None # setting path -> index in _settings_lines
+		self._settings_dirty = False
+		self._settings_stat = None # (path, mtime_ns, size) _settings_lines were read from
+		self._pending_settings = {} # set_settings values not yet written to the file
+		self._last_settings = None # last settings passed to set_settings
+		# Settings used unless the settings file or the user sets them.
+		# Both only speed up GOBNILP's scoring phase.
+		self._setting_defaults = {'prune': True}
+		if use_fast_gamma:
+			self._setting_defaults['fast'] = True
+		self.LPS = None # LP solver SCIP/GOBNILP are made with (see _lps)
+		self.CACHE_DIR = CACHE_DIR
+		# run key -> GOBNILP output, least recently used first (see learn)
+		self._learn_cache = collections.OrderedDict()
+
 	def set_SCIP(self, SCIP_DIR):
-		self.SCIP = {
-			'DIR' : SCIP_DIR, # main directory
-			'SCIPOPT_DIR' : os.path.join(SCIP_DIR, 'scipoptsuite-%s'%SCIP_VERSION),
-			'SCIP_DIR' : os.path.join(SCIP_DIR, 'scipoptsuite-%s'%SCIP_VERSION, 'scip-%s'%SCIP_VERSION),
-			'TAR_FILE' : os.path.join(SCIP_DIR, 'scipoptsuite-%s.tgz' % SCIP_VERSION),
-			'UNPACKED' : False,
-			'MADE' : False}
+		v = self.SCIP_VERSION
+		self.SCIP = _Pkg(
+			dir=SCIP_DIR, # main directory
+			scipopt_dir=os.path.join(SCIP_DIR, 'scipoptsuite-%s' % v),
+			scip_dir=os.path.join(SCIP_DIR, 'scipoptsuite-%s' % v, 'scip-%s' % v),
+			tar_file=os.path.join(SCIP_DIR, 'scipoptsuite-%s.tgz' % v))
+		self.SCIP.stamp_file = os.path.join(self.SCIP.scipopt_dir, '.pygobn_build_stamp')
+		# only exists once the tar file has been unpacked
+		self.SCIP.makefile = os.path.join(self.SCIP.scip_dir, 'Makefile')
+		# configure.sh runs from inside the GOBNILP directory, so
+		# it must be given an absolute path to SCIP.
+		self._scip_link_path = os.path.abspath(self.SCIP.scip_dir)
+		self._scip_exec_path = os.path.join(self.SCIP.scip_dir, 'bin', 'scip')
+		self._detect_state(self.SCIP, self._scip_exec_path)
 
 	def set_GOBN(self, GOBN_DIR):
-		self.GOBN = {
-			'DIR': GOBN_DIR, # main directory
-			'GOBN_DIR': os.path.join(GOBN_DIR, 'gobnilp%s'%GOBN_VERSION), # main GOBNILP directory
-			'TAR_FILE' : os.path.join(GOBN_DIR,'gobnilp%s.tar.gz' % GOBN_VERSION),
-			'UNPACKED' : False,
-			'MADE' : False}
+		v = self.GOBN_VERSION
+		self.GOBN = _Pkg(
+			dir=GOBN_DIR, # main directory
+			gobn_dir=os.path.join(GOBN_DIR, 'gobnilp%s' % v), # main GOBNILP directory
+			tar_file=os.path.join(GOBN_DIR, 'gobnilp%s.tar.gz' % v))
+		self.GOBN.stamp_file = os.path.join(self.GOBN.gobn_dir, '.pygobn_build_stamp')
+		self.GOBN.makefile = os.path.join(self.GOBN.gobn_dir, 'Makefile')
+		self._gob_exec_path = os.path.join(self.GOBN.gobn_dir, 'bin', 'gobnilp')
+		self._detect_state(self.GOBN, self._gob_exec_path)
+
+	def _detect_state(self, pkg, exec_path):
+		"""
+		Set the unpacked/made flags of *pkg* (self.GOBN or self.SCIP)
+		from what an earlier session left on disk, so that a new GOBN
+		object does not redo that work. This only stats two files -
+		make() still checks the build against its tar file.
+		"""
+		pkg.unpacked = os.path.isfile(pkg.makefile)
+		pkg.made = pkg.unpacked and os.access(exec_path, os.X_OK)
+		self._gob_exec_ok = None # set once the executable is known to exist
 
 	###############################
 	##### SETTING UP GOBNILP ######
@@ -212,7 +512,7 @@ class GOBN(object):
 
 	### MAIN EXECUTION COMMAND ###
 
-	def execute(self, command, _str=None, verbose=None, cwd=None, learn=False):
+	def execute(self, command, _str=None, verbose=None, cwd=None, env=None, capture=False):
 		"""
 		Main function to execute a command from the command line.
 
@@ -233,63 +533,213 @@ class GOBN(object):
 			Whether to change the working directory before running the command. This
 			is only used for linking SCIP to GOBNILP right now because that must be done
 			from inside the GOBNILP directory instead of the main pyGOBN directory.
+
+		*env* : None or a dictionary
+			The environment to run the command in. Defaults to the
+			environment of this process.
+
+		*capture* : a boolean
+			Whether the caller needs the command's stdout in the returned
+			output (e.g. to parse it), in which case all of it is returned.
+			Otherwise stdout is only kept when it is printed (*verbose*),
+			only stderr is returned, and only the last _OUTPUT_TAIL bytes
+			of the output are kept.
 		"""
 		if verbose is None:
 			verbose = self.VERBOSE
 
-		if learn:
-			command = ''.join(command)
-		else:
-			command = ' '.join(command)
+		if not os.path.dirname(command[0]):
+			# subprocess can only launch through posix_spawn (no fork of
+			# this process) when given a path rather than a bare name.
+			command = [shutil.which(command[0]) or command[0]] + list(command[1:])
+
+		if log.isEnabledFor(logging.DEBUG):
+			log.debug('Running: %s', ' '.join(shlex.quote(arg) for arg in command))
 		
-		process = subprocess.Popen(command, 
-			shell=True, 
-			stdout=subprocess.PIPE, 
-			stderr=subprocess.STDOUT,
-			cwd=cwd)
-
-		if verbose:
-			# Print command line output to console while it's happening
-			while True:
-				line = process.stdout.readline()
-				if line == '' and process.poll() != None:
-					break
-				sys.stdout.write(line)
-				sys.stdout.flush()
+		# Output nobody will look at is thrown away by the OS, only
+		# stderr is kept so that failures can still be reported.
+		if verbose or capture:
+			stdout, stderr = subprocess.PIPE, subprocess.STDOUT
 		else:
+			stdout, stderr = subprocess.DEVNULL, subprocess.PIPE
+
+		process = subprocess.Popen(command, 
+			stdout=stdout, 
+			stderr=stderr,
+			cwd=cwd,
+			env=env,
+			# Python's own fds are non-inheritable anyway (PEP 446), and
+			# with close_fds=False subprocess can use posix_spawn.
+			close_fds=False)
+
+		if not verbose and _str is not None:
 			# only print what is passed in as _str.
-			if _str is not None:
-				sys.stdout.write(_str)
-				sys.stdout.flush()
+			sys.stdout.write(_str)
+			sys.stdout.flush()
+
+		# Unless captured, only the tail of the output is kept in memory
+		# - a SCIP build can write many MB of compiler output.
+		pipe = process.stdout if process.stdout is not None else process.stderr
+		fd = pipe.fileno()
+		if fcntl is not None and hasattr(fcntl, 'F_SETPIPE_SZ'):
+			# a larger pipe lets the child write more before we wake up
+			try:
+				fcntl.fcntl(fd, fcntl.F_SETPIPE_SZ, _PIPE_SIZE)
+			except OSError:
+				pass
+		poller = select.poll()
+		poller.register(fd, select.POLLIN)
+		# Output is copied straight to the console's byte stream when there
+		# is one - IPython's console only accepts text.
+		out_buffer = getattr(sys.stdout, 'buffer', None)
+		decoder = codecs.getincrementaldecoder('utf-8')('replace')
+		tail = bytearray()
+		while True:
+			# block until the child writes or exits - no timed wakeups
+			poller.poll()
+			data = os.read(fd, 65536)
+			if not data:
+				break
+			if verbose:
+				# Print command line output to console while it's happening
+				if out_buffer is not None:
+					out_buffer.write(data)
+					out_buffer.flush()
+				else:
+					sys.stdout.write(decoder.decode(data))
+					sys.stdout.flush()
+			tail += data
+			if not capture:
+				del tail[:-_OUTPUT_TAIL]
+		pipe.close()
 
-		output = process.communicate()[0]
-		returncode = process.returncode
+		returncode = self._wait(process)
+		output = bytes(tail)
 
 		if returncode == 0:
 			return True, output
 		else:
 			return False, output
 
+	def _wait(self, process):
+		"""
+		Wait for *process* to exit and return its return code.
+
+		Where supported (Linux >= 5.3, Python >= 3.9) this sleeps on a
+		pidfd until the kernel reports that the child has exited,
+		rather than relying on the subprocess module's wait loop.
+
+		Arguments
+		---------
+		*process* : a subprocess.Popen object
+			The process to wait for
+		"""
+		if hasattr(os, 'pidfd_open'):
+			try:
+				fd = os.pidfd_open(process.pid)
+			except OSError:
+				return process.wait()
+			try:
+				poller = select.poll()
+				poller.register(fd, select.POLLIN)
+				poller.poll()
+			finally:
+				os.close(fd)
+		return process.wait()
+
 	### UNPACK TAR FILES ###
 
-	def unpack(self):
+	def _decompress_cmd(self, tar_file, dest):
+		"""
+		Build the command (an argument list) which extracts *tar_file*
+		into *dest*.
+
+		If pigz is found on the PATH, tar hands gzip decompression to
+		pigz, which uses all cores, otherwise tar decompresses the
+		archive itself on a single core.
+
+		Arguments
+		---------
+		*tar_file* : a string (file path)
+			The .tar.gz/.tgz file to extract
+
+		*dest* : a string (file path)
+			The directory into which the tar file is extracted
+		"""
+		# tar cannot open '' (SCIP_DIR defaults to it)
+		dest = dest or os.curdir
+		if shutil.which('pigz'):
+			return ['tar', '--use-compress-program=pigz', '-xf', tar_file, '-C', dest]
+		else:
+			return ['tar', '-xzf', tar_file, '-C', dest]
+
+	def _extract(self, tar_file, dest, _str=None):
+		"""
+		Extract *tar_file* into *dest* and return a (successful, output)
+		tuple like execute() does.
+
+		If the optional zlib-ng package is installed, the archive is
+		decompressed by its multi-threaded gzip reader and extracted
+		in-process with tarfile. Otherwise, if pigz is available, the
+		tar command from _decompress_cmd is run, and if not, tarfile
+		extracts the archive in-process on its own.
+
+		Arguments
+		---------
+		*tar_file* : a string (file path)
+			The .tar.gz/.tgz file to extract
+
+		*dest* : a string (file path)
+			The directory into which the tar file is extracted
+
+		*_str* : a string
+			The sting to print to the console while running the function
+		"""
+		if gzip_ng_threaded is None and shutil.which('pigz'):
+			unpack_command = self._decompress_cmd(tar_file, dest)
+			return self.execute(unpack_command, _str=_str)
+
+		if _str is not None:
+			sys.stdout.write(_str)
+			sys.stdout.flush()
+		try:
+			if gzip_ng_threaded is not None:
+				with gzip_ng_threaded.open(tar_file, 'rb', threads=_n_cpus()) as gz:
+					with tarfile.open(fileobj=gz, mode='r|') as tf:
+						tf.extractall(dest, **_TAR_FILTER)
+			else:
+				with tarfile.open(tar_file, 'r:gz') as tf:
+					tf.extractall(dest, **_TAR_FILTER)
+		except (OSError, tarfile.TarError) as e:
+			return False, str(e).encode()
+		return True, b''
+
+	def unpack(self, force=False):
 		"""
 		Unpack SCIP and GOBNILP from one command.
 		See the docs of the associated functions.
 
+		The two tar files are independent, so they are
+		unpacked at the same time.
+
 		This has been validated on my machine.
 
 		Arguments
 		---------
-		None
+		*force* : a boolean
+			Whether to extract the tar files even if they have
+			already been unpacked.
 
 		"""
-		self.unpack_GOBN()
-		self.unpack_SCIP()
+		with concurrent.futures.ThreadPoolExecutor(max_workers=2) as ex:
+			gobn_job = ex.submit(self.unpack_GOBN, force=force)
+			scip_job = ex.submit(self.unpack_SCIP, force=force)
+			gobn_job.result()
+			scip_job.result()
 
-	def unpack_GOBN(self, _str=None):
+	def unpack_GOBN(self, _str=None, force=False):
 		"""
-		Unpack the GOBNILP tar file, which should exist at SELF.GOBN['TAR_FILE']
+		Unpack the GOBNILP tar file, which should exist at self.GOBN.tar_file
 
 		Because GOBNILP unpacks into the existing directory,
 		a new directory will be created into which GOBNILP can
@@ -301,27 +751,31 @@ class GOBN(object):
 		---------
 		*_str* : a string
 			The sting to print to the console while running the function
+
+		*force* : a boolean
+			Whether to extract the tar file even if it has already
+			been unpacked (i.e. its Makefile exists).
 		"""
+		# already unpacked by an earlier session
+		if not force and os.path.isfile(self.GOBN.makefile):
+			self.GOBN.unpacked = True
+			return None
+
 		# create the gobnilp directory
-		dir_proc = ['mkdir', self.GOBN['GOBN_DIR']]
-		s,o = self.execute(dir_proc)
-		if not s:
-			print o
+		os.makedirs(self.GOBN.gobn_dir, exist_ok=True)
 
 		# unpack the tar file into the GOBN_DIR directory
-		unpack_command = ['tar', '-xzvf', self.GOBN['TAR_FILE'], '-C', self.GOBN['GOBN_DIR']]
-		successful, output = self.execute(unpack_command,_str=_str)
+		successful, output = self._extract(self.GOBN.tar_file, self.GOBN.gobn_dir, _str=_str)
 		if not successful:
-			print 'Unpack SCIP Failed for the following reason:'
-			print output
-			self.GOBN['UNPACKED'] = False
+			log.error('Unpack GOBN failed for the following reason:\n%s', _text(output))
+			self.GOBN.unpacked = False
 		else:
 			if self.VERBOSE:
-				print 'Unpack GOBN successful'
-			self.GOBN['UNPACKED'] = True
+				log.info('Unpack GOBN successful')
+			self.GOBN.unpacked = True
 
 
-	def unpack_SCIP(self, _str=None):
+	def unpack_SCIP(self, _str=None, force=False):
 		"""
 		Unpack the SCIP tar file. 
 
@@ -336,51 +790,284 @@ class GOBN(object):
 		---------
 		*_str* : a string
 			The sting to print to the console while running the function
+
+		*force* : a boolean
+			Whether to extract the tar file even if it has already
+			been unpacked (i.e. its Makefile exists).
 		"""
+		# already unpacked by an earlier session
+		if not force and os.path.isfile(self.SCIP.makefile):
+			self.SCIP.unpacked = True
+			return None
+
 		# unpack the tar file into the SCIP dir
-		unpack_command = ['tar', '-xzvf', self.SCIP['TAR_FILE'], '-C', self.SCIP['DIR']]
-		successful, output = self.execute(unpack_command,_str=_str)
+		successful, output = self._extract(self.SCIP.tar_file, self.SCIP.dir, _str=_str)
 		if not successful:
-			print 'Unpack SCIP Failed for the following reason:'
-			print output
-			self.SCIP['UNPACKED'] = False
+			log.error('Unpack SCIP failed for the following reason:\n%s', _text(output))
+			self.SCIP.unpacked = False
 		else:
 			if self.VERBOSE:
-				print 'Unpack SCIP successful'
-			self.SCIP['UNPACKED'] = True
+				log.info('Unpack SCIP successful')
+			self.SCIP.unpacked = True
 		
 	### MAKE SOURCE CODE ###
 
-	def make(self, CPLEX=False, verbose=None):
+	def _make_env(self, n_jobs):
+		"""
+		Return the environment for a make command, with MAKEFLAGS
+		set so that sub-makes which are not started through $(MAKE)
+		(and so do not share the top-level jobserver) still run
+		*n_jobs* jobs in parallel.
+
+		Arguments
+		---------
+		*n_jobs* : an integer
+			The number of parallel make jobs
+		"""
+		env = dict(os.environ)
+		env['MAKEFLAGS'] = '-j%d' % n_jobs
+		return env
+
+	def _lps(self, CPLEX=None):
 		"""
+		Return (and store in self.LPS) the LP solver to make SCIP and
+		GOBNILP with: 'cpx' (CPLEX) or 'spx' (SoPlex). The LP solver is
+		the inner loop of SCIP's branch-and-bound, and CPLEX is usually
+		much faster on these models, so it is used whenever SCIP can be
+		made with it - i.e. once CPLEX's headers ("cpxinc") and library
+		("libcplex.*") are linked into SCIP's lib dir.
+
 		Arguments
 		---------
-		*CPLEX* : a boolean
-			Whether to make with CPLEX linked
+		*CPLEX* : None or a boolean
+			Whether to make with CPLEX linked. If None, CPLEX is used
+			if it is linked into SCIP.
+		"""
+		if CPLEX is None:
+			lib_dir = os.path.join(self.SCIP.scip_dir, 'lib')
+			try:
+				libs = os.listdir(lib_dir)
+			except OSError:
+				libs = []
+			CPLEX = (os.path.exists(os.path.join(lib_dir, 'cpxinc'))
+				and any(lib.startswith('libcplex.')
+					and os.path.exists(os.path.join(lib_dir, lib)) for lib in libs))
+		self.LPS = 'cpx' if CPLEX else 'spx'
+		return self.LPS
+
+	def _cc_args(self):
+		"""
+		Return the make variables which put ccache (or sccache) in
+		front of the C/C++ compilers, if one of them is installed, so
+		that rebuilding the unchanged SCIP/GOBNILP sources after a clean
+		or re-unpack hits the compiler cache. They are passed on the make
+		command line because the SCIP makefiles set CC/CXX themselves,
+		which would override the environment.
+		"""
+		cache = shutil.which('ccache') or shutil.which('sccache')
+		if cache is None:
+			return []
+		cc_args = []
+		for var, default in (('CC', 'gcc'), ('CXX', 'g++')):
+			# an empty (or blank) CC/CXX means the makefiles' default
+			compiler = os.environ.get(var, '').strip() or default
+			if os.path.basename(compiler.split()[0]) not in ('ccache', 'sccache'):
+				compiler = '%s %s' % (cache, compiler)
+			cc_args.append('%s=%s' % (var, compiler))
+		return cc_args
+
+	def _tar_hash(self, pkg):
+		"""
+		Return the SHA-256 hex digest of the tar file of *pkg*
+		(self.GOBN or self.SCIP).
+		"""
+		h = hashlib.sha256()
+		_hash_file(h, pkg.tar_file)
+		return h.hexdigest()
+
+	def _is_built(self, pkg, exec_path, lps=None):
+		"""
+		Whether *pkg* (self.GOBN or self.SCIP) is already built, i.e.
+		*exec_path* exists, is newer than every source file, and - if
+		pyGOBN built it - it was built with the LP solver *lps* from a
+		tar file which, if still around, has not changed since. The tar
+		file is only hashed if its size or mtime differ from the ones
+		in the build stamp.
+
+		Arguments
+		---------
+		*pkg* : self.GOBN or self.SCIP
+
+		*exec_path* : a string (file path)
+			The binary the build produces
+
+		*lps* : a string (Optional)
+			The LP solver the build should use ('cpx' or 'spx')
+		"""
+		if not os.path.exists(exec_path):
+			return False
+		src_dir = os.path.join(os.path.dirname(os.path.dirname(exec_path)), 'src')
+		if _newest_mtime(src_dir) > os.path.getmtime(exec_path):
+			# sources were edited since the build
+			return False
+		if not os.path.isfile(pkg.stamp_file):
+			return True
+		with open(pkg.stamp_file) as f:
+			text = f.read().strip()
+		try:
+			stamp = json.loads(text)
+		except ValueError:
+			stamp = {'sha256': text} # stamps used to hold only the hash
+		if lps is not None and stamp.get('lps', lps) != lps:
+			# built with the other LP solver
+			return False
+		if not os.path.isfile(pkg.tar_file):
+			return True
+		st = os.stat(pkg.tar_file)
+		if (stamp.get('size'), stamp.get('mtime_ns')) == (st.st_size, st.st_mtime_ns):
+			return True
+		return stamp.get('sha256') == self._tar_hash(pkg)
+
+	def _write_stamp(self, pkg):
+		"""
+		Record the LP solver *pkg* (self.GOBN or self.SCIP) was just
+		built with, and the hash, size and mtime of the tar file it was
+		built from, for _is_built to check in later sessions.
+		"""
+		stamp = {'lps': self.LPS}
+		if os.path.isfile(pkg.tar_file):
+			st = os.stat(pkg.tar_file)
+			stamp.update(sha256=self._tar_hash(pkg),
+				size=st.st_size, mtime_ns=st.st_mtime_ns)
+		with open(pkg.stamp_file, 'w') as f:
+			json.dump(stamp, f)
+
+	def make(self, CPLEX=None, verbose=None, n_jobs=None):
+		"""
+		Arguments
+		---------
+		*CPLEX* : None or a boolean
+			Whether to make with CPLEX linked. If None, CPLEX is
+			used if it is linked into SCIP (see _lps).
 
 		*verbose* : a boolean
 			Whether to have verbose output
+
+		*n_jobs* : None or an integer
+			The number of parallel make jobs. Defaults to the
+			number of cpus available to this process.
 		"""
-		self.make_SCIP(CPLEX=CPLEX, verbose=verbose)
-		self.make_GOBNILP(CPLEX=CPLEX, verbose=verbose)
-		
+		if self._is_built(self.GOBN, self._gob_exec_path, self._lps(CPLEX)):
+			# GOBNILP (and therefore SCIP) has already been built.
+			self.GOBN.made = True
+			return None
 
-	def make_SCIP(self, CPLEX=False, test=False, verbose=None, from_gobn=False):
+		for pkg in (self.GOBN, self.SCIP):
+			if not pkg.unpacked and os.path.isfile(pkg.makefile):
+				# unpacked by an earlier session
+				pkg.unpacked = True
+
+		if not self.SCIP.unpacked and not self.GOBN.unpacked:
+			# nothing has been done yet - do it all in one go.
+			return self.bootstrap(CPLEX=CPLEX, n_jobs=n_jobs, verbose=verbose)
+
+		with concurrent.futures.ThreadPoolExecutor(max_workers=1) as ex:
+			# GOBNILP only needs SCIP once it is linked, so it can be
+			# unpacked while SCIP is being made.
+			gobn_job = None
+			if not self.GOBN.unpacked:
+				gobn_job = ex.submit(self.unpack_GOBN)
+			self.make_SCIP(CPLEX=CPLEX, n_jobs=n_jobs, verbose=verbose)
+			if gobn_job is not None:
+				gobn_job.result()
+		self.make_GOBNILP(CPLEX=CPLEX, n_jobs=n_jobs, verbose=verbose)
+
+	def bootstrap(self, CPLEX=None, verbose=None, n_jobs=None):
+		"""
+		Unpack, make and link SCIP and GOBNILP with one bash script.
+
+		This runs the same steps as unpack_GOBN, unpack_SCIP, make_SCIP
+		and make_GOBNILP, but chained with '&&' in a single subprocess
+		instead of starting a new process for every step. GOBNILP is
+		unpacked while SCIP is being made.
+
+		Arguments
+		---------
+		*CPLEX* : None or a boolean
+			Whether to make with CPLEX linked. If None, CPLEX is
+			used if it is linked into SCIP (see _lps).
+
+		*verbose* : a boolean
+			Whether to have verbose output
+
+		*n_jobs* : None or an integer
+			The number of parallel make jobs. Defaults to the
+			number of cpus available to this process.
+		"""
+		if n_jobs is None:
+			n_jobs = _n_cpus()
+		make_flags = ' '.join(['-j %d' % n_jobs, 'LPS=%s' % self._lps(CPLEX)]
+			+ [shlex.quote(a) for a in self._cc_args()])
+
+		q = shlex.quote
+		# GOBNILP is unpacked in the background while SCIP is unpacked
+		# and made, and waited for right before it is linked to SCIP.
+		unpack_gobn = ' && '.join([
+			'mkdir -p %s' % q(self.GOBN.gobn_dir),
+			' '.join(map(q, self._decompress_cmd(self.GOBN.tar_file, self.GOBN.gobn_dir)))])
+		script = '( %s ) & unpack_gobn=$!; ' % unpack_gobn + ' && '.join([
+			' '.join(map(q, self._decompress_cmd(self.SCIP.tar_file, self.SCIP.dir))),
+			'make %s -C %s' % (make_flags, q(self.SCIP.scipopt_dir)),
+			'wait $unpack_gobn',
+			# configure.sh fails if SCIP is already linked, which is fine,
+			# so its outcome is read from its output (as in make_GOBNILP),
+			# which goes to stderr to be reported if linking failed.
+			'(cd %s && out=$(./configure.sh %s 2>&1); printf "%%s\\n" "$out" >&2;'
+				' printf "%%s\\n" "$out" | grep -Eq %s)' % (q(self.GOBN.gobn_dir),
+				q(self._scip_link_path), q(_CONFIG_RESULT.pattern.decode())),
+			'make %s -C %s' % (make_flags, q(self.GOBN.gobn_dir))])
+
+		_str = 'Unpacking and making SCIP and GOBNILP.. This may take a few minutes.\n'
+		successful, output = self.execute(['bash', '-c', script], _str=_str, verbose=verbose,
+			env=self._make_env(n_jobs))
+
+		if successful:
+			log.info('GOBNILP make was successful. You can now use pyGOBN freely.')
+			self._write_stamp(self.SCIP)
+			self._write_stamp(self.GOBN)
+		else:
+			log.error('Bootstrapping SCIP and GOBNILP failed for the following reason:\n%s',
+				_text(output))
+
+		for pkg in (self.GOBN, self.SCIP):
+			pkg.unpacked = successful
+			pkg.made = successful
+
+
+	def make_SCIP(self, CPLEX=None, test=False, verbose=None, from_gobn=False, n_jobs=None):
 		"""
 		Steps:
 			1. Unpack SCIP if necessary
-			2. make
+			2. make -j n_jobs
 		"""
 		if verbose is None:
 			verbose = self.VERBOSE
+		if n_jobs is None:
+			n_jobs = _n_cpus()
+
+		### CHECK WHETHER SCIP HAS ALREADY BEEN MADE ###
+		if self._is_built(self.SCIP, self._scip_exec_path, self._lps(CPLEX)):
+			self.SCIP.unpacked = True
+			self.SCIP.made = True
+			return None
 
 		### CHECK THAT SCIP HAS BEEN UNPACKED ###
-		if not self.SCIP['UNPACKED']:
+		if not self.SCIP.unpacked:
 			_str = 'SCIP needs to be unpacked.. Trying that now. \n'
 			self.unpack_SCIP(_str)
 		
 		### If still not unpacked, it failed - so exit. ###
-		if not self.SCIP['UNPACKED']:
+		if not self.SCIP.unpacked:
 			return None
 
 		if from_gobn:
@@ -389,27 +1076,28 @@ class GOBN(object):
 			_str = 'Making SCIP.. This may take a few minutes.\n'
 		
 		### EXECUTE MAKE COMMAND ###
-		if CPLEX:
-			make_command = ['make', 'LPS=cpx', '-C', self.SCIP['SCIPOPT_DIR']]
-		else:
-			make_command = ['make', '-C', self.SCIP['SCIPOPT_DIR']]
-		successful, output = self.execute(make_command, _str=_str, verbose=verbose)
+		make_command = ['make', '-j', str(n_jobs), 'LPS=%s' % self._lps(CPLEX),
+			'-C', self.SCIP.scipopt_dir]
+		make_command += self._cc_args()
+		successful, output = self.execute(make_command, _str=_str, verbose=verbose,
+			env=self._make_env(n_jobs))
 		
 		if not successful:
-			print 'Make SCIP Failed for the following reason:'
-			print output
-			self.SCIP['UNPACKED'] = False
-		else:
-			print 'Make SCIP successful'
-			self.SCIP['UNPACKED'] = True
-
+			log.error('Make SCIP failed for the following reason:\n%s', _text(output))
+			self.SCIP.made = False
+			return None
 
-		self.SCIP['MADE'] = True
+		log.info('Make SCIP successful')
+		self._write_stamp(self.SCIP)
+		self.SCIP.made = True
 
 		if test:
-			test_out = subprocess.check_output(['make', 'test', '-C', self.SCIP['DIR']])
+			test_command = ['make', 'test', 'LPS=%s' % self.LPS, '-C', self.SCIP.scipopt_dir]
+			successful, output = self.execute(test_command, verbose=verbose)
+			if not successful:
+				log.error('SCIP tests failed for the following reason:\n%s', _text(output))
 	
-	def make_GOBNILP(self, CPLEX=False, verbose=None):
+	def make_GOBNILP(self, CPLEX=None, verbose=None, n_jobs=None):
 		"""
 		Make the GOBNILP source code.
 
@@ -417,20 +1105,28 @@ class GOBN(object):
 		Steps:
 			1. Unpack GOBN if necessary
 			2. ./configure.sh SCIP_DIR
-			3. make (LPS=cpx if possible)
+			3. make -j n_jobs LPS=cpx/spx (cpx if CPLEX is linked)
 		"""
 		if verbose is None:
 			verbose = self.VERBOSE
+		if n_jobs is None:
+			n_jobs = _n_cpus()
+
+		### CHECK WHETHER GOBNILP HAS ALREADY BEEN MADE ###
+		if self._is_built(self.GOBN, self._gob_exec_path, self._lps(CPLEX)):
+			self.GOBN.unpacked = True
+			self.GOBN.made = True
+			return None
 
 		### CHECK THAT SCIP HAS BEEN MADE ###
-		if not self.SCIP['MADE']:
-			self.make_SCIP(verbose=verbose, from_gobn=True)
+		if not self.SCIP.made:
+			self.make_SCIP(CPLEX=CPLEX, n_jobs=n_jobs, verbose=verbose, from_gobn=True)
 		# if still not made, it failed - so exit
-		if not self.SCIP['MADE']:
+		if not self.SCIP.made:
 			return None
 		
 		### CHECK THAT GOBNILP HAS BEEN UNPACKED ###
-		if not self.GOBN['UNPACKED']:
+		if not self.GOBN.unpacked:
 			_str = 'GOBNILP needs to be unpacked .. Trying that now.\n'
 			self.unpack_GOBN(_str)
 			
@@ -438,38 +1134,37 @@ class GOBN(object):
 		### LINK SCIP TO GOBNILP ###
 
 		_str = 'Linking SCIP to GOBNILP..\n'
-		config_command = ['./configure.sh', self.SCIP['SCIP_DIR']]
-		successful, output = self.execute(config_command, _str=_str, cwd=self.GOBN['GOBN_DIR'])
-		if 'SUCCEEDED' in output:
-			print 'SCIP Linking was successful.'
-			#subprocess.call(['cd' , '../../']) # change back to main dir
-		elif 'exists' in output:
-			print 'SCIP already Linked to GOBNILP.. Moving on.'
-			#subprocess.call(['cd' , '../../']) # change back to main dir
+		config_command = ['./configure.sh', self._scip_link_path]
+		successful, output = self.execute(config_command, _str=_str, cwd=self.GOBN.gobn_dir,
+			capture=True)
+		m = _CONFIG_RESULT.search(output)
+		tag = m.group() if m else None
+		if tag == b'SUCCEEDED':
+			log.info('SCIP linking was successful.')
+		elif tag == b'exists':
+			log.info('SCIP already linked to GOBNILP.. Moving on.')
 		else:
-			print 'SCIP Linking was unsuccessful for the following reason: \n'
-			print output
-			print '\n EXITING WITHOUT MAKING GOBNILP.\n'
-			#subprocess.call(['cd' , '../../']) # change back to main dir
+			log.error('SCIP linking was unsuccessful for the following reason:\n%s'
+				'\nEXITING WITHOUT MAKING GOBNILP.', _text(output))
 			return None
 
 		### MAKE GOBNILP ###
 
 		
-		if CPLEX:
-			make_command = ['make', 'LPS=cpx', '-C', self.GOBN['DIR']]
-		else:
-			make_command = ['make', '-C', self.GOBN['DIR']]
+		make_command = ['make', '-j', str(n_jobs), 'LPS=%s' % self._lps(CPLEX),
+			'-C', self.GOBN.gobn_dir]
+		make_command += self._cc_args()
 		_str = 'Making GOBNILP..\n'
-		successful, output = self.execute(make_command,_str=_str, verbose=verbose)
+		successful, output = self.execute(make_command, _str=_str, verbose=verbose,
+			env=self._make_env(n_jobs))
 		
 		if successful:
-			print 'GOBNILP Make was Successful. You can now use pyGOBN freely.'
-			self.GOBN['MADE'] = True
+			log.info('GOBNILP make was successful. You can now use pyGOBN freely.')
+			self.GOBN.made = True
+			self._write_stamp(self.GOBN)
 		else:
-			print 'GOBNILP Make was UNSUCCESSFUL for the following reason: \n'
-			print output
-			print 'EXITING WITHOUT MAKING GOBNILP.'
+			log.error('GOBNILP make was UNSUCCESSFUL for the following reason:\n%s'
+				'\nEXITING WITHOUT MAKING GOBNILP.', _text(output))
 
 
 	def clean(self):
@@ -480,14 +1175,12 @@ class GOBN(object):
 		---------
 		None
 		"""
-		gobn_proc = ['rm', '-r', self.GOBN['GOBN_DIR']]
-		s,o = self.execute(gobn_proc)
-		if not s:
-			print o
-		scip_proc = ['rm', '-r', self.SCIP['SCIPOPT_DIR']]
-		s,o = self.execute(scip_proc)
-		if not s:
-			print o
+		shutil.rmtree(self.GOBN.gobn_dir, ignore_errors=True)
+		shutil.rmtree(self.SCIP.scipopt_dir, ignore_errors=True)
+		for pkg in (self.GOBN, self.SCIP):
+			pkg.unpacked = False
+			pkg.made = False
+		self._gob_exec_ok = None
 
 
 	################################
@@ -509,10 +1202,16 @@ class GOBN(object):
 		'delimeter = "whitespace"' instead of 
 		'gobnilp/delimeter = "whitespace"'.
 
+		The new settings are kept in memory and only written to
+		the settings file when learn() runs the solver.
+
 		Arguments
 		---------
 		*settings* : a dictionary, where
 			key = setting and value = setting value.
+			A KeyError is raised for a setting name which is not
+			one of the options below (full parameter paths such as
+			'limits/time' are passed through as they are).
 
 		SETTINGS 
 		OPTIONS
@@ -550,6 +1249,10 @@ class GOBN(object):
 			*pedigree* : a string - file name
 				whether to output the learned BN as a pedigree - only useful
 				when using GOBNILP for finding perdigrees.
+			*scores* : a string (ending in '.jkl') - file name
+				where to write the local scores GOBNILP computes, so
+				that later runs on the same data can skip scoring by
+				passing the file to learn() as *scores_path*.
 
 		(gobnilp/scoring/) 
 			*alpha* : equivalent sample size
@@ -572,29 +1275,136 @@ class GOBN(object):
 
 
 		"""
-		# Read mysettings.txt into one big string
-		with open(self.SETTINGS_FILE, 'r') as f:
-			txt = f.read()
+		# Setting the same values again changes nothing, unless the
+		# settings file was changed since (see _load_settings)
+		self._load_settings()
+		settings_key = tuple(sorted(settings.items()))
+		if settings_key == self._last_settings:
+			return None
 
-		# For all of the passed-in settings:
-		# 	If the setting is found in mysettings.txt then
-		# 			replace the existing value with the passed-in value
+		# Resolve the passed-in setting names to full GOBNILP paths,
+		# before anything is changed - a misspelled setting would
+		# otherwise only show up after a (long) solver run.
+		values = {}
 		for s_name, s_val in settings.items():
-			start_idx = txt.find(s_name)
-			if start_idx == -1: # SETTING NOT FOUND
-				print '%s is not a valid setting.. Moving on.' % s_name
-			else: # SETTING WAS FOUND
-				temp_sv = txt[start_idx:].rsplit('\n')[0]
-				val_start = start_idx + temp_sv.index('=') + 1
-				val_end = start_idx + len(temp_sv)
-				if '"'  in txt[val_start:val_end]:
-					txt = txt[:val_start+1] + '"' + str(s_val) + '"' + txt[val_end:]
-				else:
-					txt = txt[:val_start+1] + str(s_val) + txt[val_end:]
+			s_path = _setting_path(s_name)
+			if s_path is None:
+				raise KeyError('%s is not a valid setting' % s_name)
+			values[s_path] = s_val
 
-		# Write the altered text back to mysettings.txt
-		with open(self.SETTINGS_FILE, 'w') as f:
-			f.write(txt)
+		self._apply_settings(values)
+		self._pending_settings.update(values)
+		# only remembered once applied, so a failed call can be retried
+		self._last_settings = settings_key
+
+	def _load_settings(self):
+		"""
+		Parse the settings file into memory, and fill in the default
+		settings (see __init__) which the file does not set itself.
+
+		The file is only read again if SETTINGS_FILE now names another
+		file, or the file was changed (e.g. edited by hand) since it
+		was read or written here - the settings passed to set_settings
+		which are not written yet are then applied to it again.
+
+		The file is kept as a list of its lines plus an index from each
+		setting's full path to the line holding it - the uncommented
+		line if there is one, else the first commented-out one - so
+		that setting a value only touches that one line.
+		"""
+		st = os.stat(self.SETTINGS_FILE)
+		settings_stat = (self.SETTINGS_FILE, st.st_mtime_ns, st.st_size)
+		if self._settings_lines is not None and settings_stat == self._settings_stat:
+			return None
+		with open(self.SETTINGS_FILE, 'r') as f:
+			self._settings_lines = f.read().split('\n')
+		self._settings_stat = settings_stat
+		self._settings_dirty = False
+		# set_settings must not skip settings the new file may not have
+		self._last_settings = None
+
+		self._settings_index = {}
+		active = set() # settings with an uncommented line
+		for i, line in enumerate(self._settings_lines):
+			m = _SETTING_LINE.match(line)
+			if m is None:
+				continue
+			s_path = m.group(2)
+			if s_path in active:
+				continue
+			if not m.group(1):
+				active.add(s_path)
+				self._settings_index[s_path] = i
+			elif s_path not in self._settings_index:
+				self._settings_index[s_path] = i
+
+		defaults = {}
+		for s_name, s_val in self._setting_defaults.items():
+			s_path = _SETTING_PATHS[s_name]
+			if s_path not in active:
+				defaults[s_path] = s_val
+		if defaults:
+			self._apply_settings(defaults)
+		if self._pending_settings:
+			self._apply_settings(self._pending_settings)
+
+	def _apply_settings(self, values):
+		"""
+		Set the settings in *values* (full GOBNILP path -> value)
+		in the in-memory copy of the settings file.
+		"""
+		lines = self._settings_lines
+		for s_path, s_val in values.items():
+			i = self._settings_index.get(s_path)
+			if i is None:
+				# Settings which are not in the file at all are added at
+				# the end (before the empty string after a final newline)
+				i = len(lines) - 1 if lines[-1] == '' else len(lines)
+				lines.insert(i, '%s = %s' % (s_path, _format_setting(s_val)))
+				self._settings_index[s_path] = i
+			else:
+				# The line is uncommented, and the value is quoted if it was before.
+				m = _SETTING_LINE.match(lines[i])
+				quoted = m.group(4).startswith('"')
+				lines[i] = s_path + m.group(3) + _format_setting(s_val, quoted)
+
+		# Keep the altered lines until the solver is run
+		self._settings_dirty = True
+
+	def _setting_value(self, s_path):
+		"""
+		Return the value (a string, without quotes) which the settings
+		file gives the setting with full path *s_path*, or None if the
+		setting is not set (missing or commented out).
+		"""
+		self._load_settings()
+		i = self._settings_index.get(s_path)
+		if i is None:
+			return None
+		m = _SETTING_LINE.match(self._settings_lines[i])
+		if m.group(1):
+			return None
+		return m.group(4).strip().strip('"')
+
+	def _flush_settings(self):
+		"""
+		Write the settings changed by set_settings back to the
+		settings file, if there are any. This is done right before
+		GOBNILP is run, so repeated calls to set_settings only touch
+		the disk once.
+
+		Arguments
+		---------
+		None
+		"""
+		self._load_settings()
+		if self._settings_dirty:
+			with open(self.SETTINGS_FILE, 'w') as f:
+				f.write('\n'.join(self._settings_lines))
+			self._settings_dirty = False
+			st = os.stat(self.SETTINGS_FILE)
+			self._settings_stat = (self.SETTINGS_FILE, st.st_mtime_ns, st.st_size)
+		self._pending_settings = {}
 
 	### EDGE AND INDEPENDENCE CONSTRAINTS
 
@@ -641,44 +1451,48 @@ class GOBN(object):
 			the existing constraint file.
 
 		"""
-		if append:
-			f = open(self.CONSTRAINTS_FILE,	'a')
-		else:
-			f = open(self.CONSTRAINTS_FILE, 'w')
-			
+		def rv_set(rvs):
+			# a single rv name, or a tuple of rv names
+			return rvs if isinstance(rvs, str) else ','.join(rvs)
+
+		lines = []
+
 		# EDGE CONSTRAINTS
-		for rv, children in edges.items():
+		for rv, children in edge_reqs.items():
 			for child in children:
-				e_cons = '%s<-%s' % (child, rv)
-				f.write(e_cons)
+				lines.append('%s<-%s' % (child, rv))
 
 		# INDEPENDENCIES CONSTRAINTS
-		for i in independencies:
+		for i in ind_reqs:
 			if len(i) == 2:
-				lhs = ','.join(i[0])
-				rhs = ','.join(i[1])
-				i_cons = '%s_|_%s' % (lhs, rhs)
+				lines.append('%s_|_%s' % (rv_set(i[0]), rv_set(i[1])))
 			elif len(i) == 3:
-				lhs = ','.join(i[0])
-				rhs = ','.join(i[1])
-				cond = ','.join(i[2])
-				i_cons = '%s_|_%s|%s' % (lhs, rhs, cond)
-			f.write(i_cons)
+				lines.append('%s_|_%s|%s' % (rv_set(i[0]), rv_set(i[1]), rv_set(i[2])))
 
 		# NON-EDGE CONSTRAINTS
-		for rv, children in nonedges.items():
+		for rv, children in nonedge_reqs.items():
 			for child in children:
-				e_cons = '~%s<-%s' % (child, rv)
-				f.write(e_cons)
+				lines.append('~%s<-%s' % (child, rv))
+
+		if append and os.path.isfile(self.CONSTRAINTS_FILE) \
+				and os.path.getsize(self.CONSTRAINTS_FILE) > 0:
+			# make sure the first new constraint starts on its own line
+			with open(self.CONSTRAINTS_FILE, 'rb') as f:
+				f.seek(-1, os.SEEK_END)
+				if f.read(1) != b'\n':
+					lines.insert(0, '')
 
-		f.close()
+		with open(self.CONSTRAINTS_FILE, 'a' if append else 'w') as f:
+			f.write('\n'.join(lines) + '\n')
 
-	def write_data(self, data, header=None):
+	def write_data(self, data, header=None, arities=None, _name='userdata.dat'):
 		"""
 		Write data to file in order to be read by GOBNILP solver, and
 		return the path to which the passed-in data file was written.
 
 		This function should support numpy ndarray and pandas dataframe.
+		The file starts with a line of variable names (if there are
+		any) and a line of variable arities.
 
 		Arguments
 		---------
@@ -687,31 +1501,191 @@ class GOBN(object):
 
 		*header* : a list of strings
 			The header of the data if it's not included.
+
+		*arities* : a list of integers (Optional)
+			The number of states of each variable. Defaults to max+1
+			for variables coded as non-negative integers (0..r-1).
+			Any other variable is re-coded as 0..r-1 in sorted order
+			of its values, and defaults to its r distinct values. Pass them
+			if a state may be missing from the data - e.g. for folds or
+			resamples which must all use the same arities.
+
+		*_name* : a string
+			The name of the data file inside DATA_DIR.
 		"""
-		settings = {'delimiter': ','}
-		data_path = os.path.join(self.DATA_DIR, 'userdata.dat')
+		os.makedirs(self.DATA_DIR, exist_ok=True)
+		data_path = os.path.join(self.DATA_DIR, _name)
 
-		if isinstance(data, np.ndarray):
-			if header is not None:
-				np.savetxt(data_path, data, sep=',', header=header)
-				settings['names'] = 'TRUE'
+		if isinstance(data, pd.DataFrame):
+			header = [str(c) for c in data.columns]
+		else:
+			data = pd.DataFrame(data, columns=header)
+
+		# GOBNILP reads the states of a variable as codes 0..r-1, so
+		# any other values (strings, floats, negative numbers) are
+		# re-coded as in compute_local_scores.
+		columns = []
+		n_states = []
+		recoded = False
+		for _, col in data.items():
+			if col.dtype.kind in 'iu' and len(col) and col.min() >= 0:
+				columns.append(col.values)
+				n_states.append(int(col.max()) + 1)
 			else:
-				np.savetxt(data_path, data)
-		elif isinstance(data, pd.dataframe):
-			data.to_csv(data_path, sep=',')
-			settings['names'] = 'TRUE'
-
+				states, codes = np.unique(col.values, return_inverse=True)
+				columns.append(codes)
+				n_states.append(len(states))
+				recoded = True
+		if recoded:
+			data = pd.DataFrame(dict(enumerate(columns)))
+
+		# GOBNILP reads the variable names (if any) and then the
+		# arities (number of states) of the variables from the first
+		# lines, followed by the data itself - written by pandas' C
+		# writer, which is much faster than np.savetxt.
+		if arities is None:
+			arities = n_states
+		preamble = [','.join(str(a) for a in arities)]
+		if header is not None:
+			preamble.insert(0, ','.join(header))
+		with open(data_path, 'w') as f:
+			f.write('\n'.join(preamble) + '\n')
+			data.to_csv(f, sep=',', index=False, header=False)
+
+		settings = {'delimiter': ',', 'names': header is not None, 'arities': True}
 		self.set_settings(settings)
 
 		return data_path
 		
 
+	### LOCAL SCORES ###
+
+	def compute_local_scores(self, data, names=None, palim=3, alpha=1.0):
+		"""
+		Compute the BDeu local score of every variable for every parent
+		set of at most *palim* variables, and write them to a local
+		scores file in GOBNILP's Jaakkola ('.jkl') format. Return the
+		path of that file.
+
+		GOBNILP can be run on the scores file (with "-f=jkl") instead of
+		on the raw data, which skips its own scoring phase. The file is
+		named after a SHA-256 hash of the data, names, palim and alpha,
+		so calling this again with the same inputs returns the existing
+		file without recomputing anything.
+
+		If numba is installed, the scores are computed by a compiled
+		kernel in parallel over all (variable, parent set) pairs.
+
+		Arguments
+		---------
+		*data* : a numpy ndarray or pandas dataframe
+			The discrete dataset, one column per variable.
+
+		*names* : a list of strings (Optional)
+			The variable names. Defaults to the dataframe columns,
+			or to the column numbers for an ndarray.
+
+		*palim* : an integer
+			The maximum number of parents of any variable.
+
+		*alpha* : a float
+			The equivalent sample size of the BDeu score.
+		"""
+		if isinstance(data, pd.DataFrame):
+			if names is None:
+				names = [str(c) for c in data.columns]
+			data = data.values
+		n_vars = data.shape[1]
+		if names is None:
+			names = [str(i) for i in range(n_vars)]
+		palim = min(palim, n_vars - 1)
+
+		h = hashlib.sha256()
+		_hash_array(h, data)
+		h.update(repr((data.shape, str(data.dtype), list(names), palim, alpha)).encode())
+		os.makedirs(self.DATA_DIR, exist_ok=True)
+		scores_path = os.path.join(self.DATA_DIR, 'scores_%s.jkl' % h.hexdigest()[:16])
+		if os.path.isfile(scores_path):
+			return scores_path
+
+		# re-code every variable's states as 0..r-1
+		codes = np.empty(data.shape, dtype=np.int64)
+		arities = np.empty(n_vars, dtype=np.int64)
+		for v in range(n_vars):
+			states, codes[:, v] = np.unique(data[:, v], return_inverse=True)
+			arities[v] = len(states)
+
+		# all (child, parent set) pairs, smallest parent sets first
+		pairs = [(child, pa) for child in range(n_vars)
+			for size in range(palim + 1)
+			for pa in itertools.combinations([v for v in range(n_vars) if v != child], size)]
+		children = np.array([child for child, pa in pairs], dtype=np.int64)
+		parents = np.full((len(pairs), max(palim, 1)), -1, dtype=np.int64)
+		for s, (child, pa) in enumerate(pairs):
+			parents[s, :len(pa)] = pa
+
+		if njit is not None:
+			scores = _local_scores_kernel(codes, arities, children, parents, float(alpha))
+		else:
+			scores = np.empty(len(pairs))
+			for s, (child, pa) in enumerate(pairs):
+				r = int(arities[child])
+				cfg = np.zeros(len(codes), dtype=np.int64)
+				q = 1
+				for p in pa:
+					cfg = cfg * arities[p] + codes[:, p]
+					q *= int(arities[p])
+				counts = np.bincount(cfg * r + codes[:, child], minlength=q * r)
+				scores[s] = _bdeu_score(counts, q, r, float(alpha))
+
+		# Only keep parent sets which score better than all of their
+		# subsets - GOBNILP would never choose the others.
+		lines = ['%d\n' % n_vars]
+		s = 0
+		for child in range(n_vars):
+			best = {} # parent set -> best score of it and its subsets
+			kept = []
+			while s < len(pairs) and pairs[s][0] == child:
+				pa, score = pairs[s][1], scores[s]
+				best_subset = -np.inf
+				if pa:
+					best_subset = max(best[sub] for sub in itertools.combinations(pa, len(pa) - 1))
+				best[pa] = max(score, best_subset)
+				if score > best_subset:
+					kept.append((score, pa))
+				s += 1
+			lines.append('%s %d\n' % (names[child], len(kept)))
+			for score, pa in kept:
+				lines.append('%r %d%s\n' % (float(score), len(pa),
+					''.join(' ' + names[p] for p in pa)))
+
+		with open(scores_path, 'w') as f:
+			f.write(''.join(lines))
+
+		return scores_path
+
 	### RUN METHODS ###
 
+	def _check_exec(self):
+		"""
+		Whether the GOBNILP executable exists. Only a positive
+		result is cached, so a later make() is picked up.
+		"""
+		if not self._gob_exec_ok:
+			self._gob_exec_ok = os.access(self._gob_exec_path, os.X_OK)
+			if not self._gob_exec_ok:
+				log.error('GOBNILP executable not found at %s .. Run make() first.',
+					self._gob_exec_path)
+		return self._gob_exec_ok
+
 	def learn(self, 
 			data, 
 			names=None,
-			verbose=True):
+			verbose=True,
+			local_scores=False,
+			scores_path=None,
+			use_cache=True,
+			arities=None):
 		"""
 		Main function to run GOBNILP.
 
@@ -740,60 +1714,322 @@ class GOBN(object):
 		------
 		By default, GOBNILP prints out the learned BN structure
 		with one line for each node specifying its parents and
-		the local score for that choice of parents.
+		the local score for that choice of parents. These lines
+		are parsed from GOBNILP's output and returned as a dict
+		mapping each node to a (list of parents, local score) tuple,
+		so no solution file has to be written and read back. If
+		more than one BN is learned (see *nbns*), the first one
+		is returned. None is returned if the run failed or found no BN.
 
 		Arguments
 		---------
 		*data* : a string (data path file) or dataset itself.
 
-		*header* : a list of strings (Optional)
+		*names* : a list of strings (Optional)
 			The header of the data file if it's not included.
 
 		*verbose* : a boolean
 			Whether to have verbose output or not.
 
+		*local_scores* : a boolean
+			Whether to compute the local scores in Python with
+			compute_local_scores (with the palim and alpha of the
+			settings file, or GOBNILP's defaults of 3 and 1 if it does
+			not set them) and run GOBNILP on those instead of on the
+			raw data.
+			Only used when *data* is a dataset, not a file path.
+
+		*scores_path* : a string (file path) (Optional)
+			A local scores ('.jkl') file to run GOBNILP on instead of
+			*data*, which is then ignored. This skips GOBNILP's scoring
+			phase on repeated runs over the same data - e.g. make the
+			first run with set_settings({'scores': 'data.jkl'}) and
+			pass scores_path='data.jkl' to the following ones.
+
+		*use_cache* : a boolean
+			Whether to reuse the result of an earlier run with the same
+			data, settings, constraints and GOBNILP binary instead of
+			running GOBNILP again. The last 128 results are kept in
+			memory, and on disk as well if CACHE_DIR was given.
+			A cached result does not re-write any GOBNILP output files,
+			and it ignores that a run which hit a time limit might find
+			a better BN if run again.
+
+		*arities* : a list of integers (Optional)
+			The number of states of each variable - see write_data.
+
 		Notes
 		-----
 		- Works, but output file path needs to be setup/fixed.
 		"""
 
-		if isinstance(data, str):
+		### CHECK THAT GOBNILP HAS BEEN MADE ###
+		if not self._check_exec():
+			return None
+
+		data_format = '-f=dat'
+		if scores_path is not None:
+			DATA_PATH = scores_path
+			data_format = '-f=jkl'
+		elif isinstance(data, str):
 			DATA_PATH = data
+		elif local_scores:
+			# score with the same palim and alpha GOBNILP would use
+			palim = self._setting_value('gobnilp/scoring/palim')
+			alpha = self._setting_value('gobnilp/scoring/alpha')
+			DATA_PATH = self.compute_local_scores(data, names,
+				palim=3 if palim is None else int(palim),
+				alpha=1.0 if alpha is None else float(alpha))
+			data_format = '-f=jkl'
 		else:
-			DATA_PATH = self.write_data(data, names)
+			DATA_PATH = self.write_data(data, names, arities)
 
 		# RUN GOBNILP SOLVER
 
-		bin_path = os.path.join(self.GOBN['GOBN_DIR'], 'bin/gobnilp')
-		learn_cmd = [bin_path, ' -g=', self.SETTINGS_FILE, ' -f=dat ', DATA_PATH]
-		_str = 'Running GOBNILP Solver.. This may take a few minutes.'
-		successful, output = self.execute(learn_cmd, _str=_str, verbose=verbose, learn=True)
-
-		if successful:
-			print 'Solver run was SUCCESSFUL'
-		else:
-			print 'Solver run was UNSUCCESSFUL for the following reason: \n'
-			print output
-
-
-
+		self._flush_settings()
 
+		if self.LPS is not None:
+			log.debug('GOBNILP was made with LPS=%s', self.LPS)
+		learn_cmd = [self._gob_exec_path, '-g=' + self.SETTINGS_FILE, data_format, DATA_PATH]
 
+		if use_cache:
+			key = self._learn_key(learn_cmd)
+			output = self._cached_output(key)
+			if output is not None:
+				log.info('Using the cached result of an identical solver run')
+				return self._parse_bn(output)
 
+		_str = 'Running GOBNILP Solver.. This may take a few minutes.'
+		successful, output = self.execute(learn_cmd, _str=_str, verbose=verbose, capture=True)
 
+		if successful:
+			bn = self._parse_bn(output)
+			if bn is None:
+				return None
+			log.info('Solver run was SUCCESSFUL')
+			if use_cache:
+				self._cache_output(key, output)
+			return bn
+		else:
+			log.error('Solver run was UNSUCCESSFUL for the following reason:\n%s',
+				_text(output[-_OUTPUT_TAIL:]))
+			return None
 
+	def _learn_key(self, learn_cmd):
+		"""
+		Return a SHA-256 hex digest identifying a solver run: its
+		command line, the contents of its data file, of the settings
+		file (as written by _flush_settings, so that edits made to it
+		by hand count too), of the constraints file it names and the
+		GOBNILP binary (its size, modification time and build stamp).
+		"""
+		h = hashlib.sha256('\0'.join(learn_cmd).encode())
+		constraints_file = self._setting_value(_SETTING_PATHS['dagconstraintsfile'])
+		if constraints_file is None:
+			constraints_file = self.CONSTRAINTS_FILE
+		for path in (learn_cmd[-1], self.SETTINGS_FILE, constraints_file, self.GOBN.stamp_file):
+			h.update(b'\0')
+			if os.path.isfile(path):
+				_hash_file(h, path)
+		st = os.stat(learn_cmd[0])
+		h.update(('\0%d\0%d' % (st.st_size, st.st_mtime_ns)).encode())
+		return h.hexdigest()
+
+	def _cached_output(self, key):
+		"""
+		Return the GOBNILP output of the run identified by *key*, from
+		memory or from CACHE_DIR, or None if it was never run.
+		"""
+		output = self._learn_cache.get(key)
+		if output is not None:
+			self._learn_cache.move_to_end(key)
+		elif self.CACHE_DIR is not None:
+			path = os.path.join(self.CACHE_DIR, key + '.out')
+			try:
+				with open(path, 'rb') as f:
+					output = f.read()
+				os.utime(path) # the disk cache evicts by mtime
+			except OSError:
+				return None
+			self._remember_output(key, output)
+		return output
+
+	def _remember_output(self, key, output):
+		"""
+		Keep *output* in the in-memory cache, dropping the least
+		recently used outputs past _MEMORY_CACHE_SIZE of them.
+		"""
+		self._learn_cache[key] = output
+		self._learn_cache.move_to_end(key)
+		while len(self._learn_cache) > _MEMORY_CACHE_SIZE:
+			self._learn_cache.popitem(last=False)
 
+	def _cache_output(self, key, output):
+		"""
+		Keep the GOBNILP *output* of the run identified by *key*, in
+		memory and (if possible) in CACHE_DIR, where only the most
+		recently used _DISK_CACHE_SIZE outputs are kept.
+		"""
+		self._remember_output(key, output)
+		if self.CACHE_DIR is None:
+			return None
+		path = os.path.join(self.CACHE_DIR, key + '.out')
+		try:
+			os.makedirs(self.CACHE_DIR, exist_ok=True)
+			# write then rename, so that no other process reads half a file
+			with open(path + '.tmp%d' % os.getpid(), 'wb') as f:
+				f.write(output)
+			os.replace(path + '.tmp%d' % os.getpid(), path)
+
+			entries = [e for e in os.scandir(self.CACHE_DIR) if e.name.endswith('.out')]
+			if len(entries) > _DISK_CACHE_SIZE:
+				entries.sort(key=lambda e: e.stat().st_mtime)
+				for e in entries[:len(entries) - _DISK_CACHE_SIZE]:
+					os.remove(e.path)
+		except OSError as e:
+			log.debug('Could not cache the solver output: %s', e)
+
+	def _parse_bn(self, output):
+		"""
+		Parse the learned BN from GOBNILP's (bytes) output into a dict
+		of node -> (list of parents, local score). Parsing stops at the
+		"BN score is" line which ends the first BN, so when GOBNILP
+		prints several BNs (nbns > 1) only the first one is returned.
+		If the output holds no BN at all, e.g. because the time limit
+		was reached before a solution was found, an error is logged
+		and None is returned, as for a failed run.
+		"""
+		bn = {}
+		complete = False
+		for line in output.splitlines():
+			if line.startswith(b'BN score is'):
+				complete = True
+				break
+			m = _BN_LINE.match(line)
+			if m is None:
+				continue
+			parents = [pa.decode() for pa in m.group(2).split(b',') if pa]
+			try:
+				score = float(m.group(3))
+			except ValueError:
+				continue
+			bn[m.group(1).decode()] = (parents, score)
+		if not bn:
+			log.error('No BN found in the GOBNILP output:\n%s', _text(output[-_OUTPUT_TAIL:]))
+			return None
+		if not complete:
+			log.error('GOBNILP output ended before the BN score line - '
+				'the returned BN may be incomplete.')
+		return bn
 
+	def learn_many(self, data_paths, max_workers=None, verbose=False):
+		"""
+		Run GOBNILP on many data files at once, e.g. for a sweep
+		over datasets or bootstrap resamples.
 
+		GOBNILP solves each dataset on a single core, so the runs
+		are independent and are started side by side, at most
+		*max_workers* at a time. Each run gets its own copy of the
+		settings file in which every output file name is suffixed
+		with the index of its data file (e.g. "out.sol" -> "out_3.sol"),
+		so that the runs do not overwrite each other's results.
 
+		Arguments
+		---------
+		*data_paths* : a list of strings
+			The data files to learn a BN from.
 
+		*max_workers* : an integer (Optional)
+			The max number of GOBNILP processes to run at once.
+			Defaults to the number of cpus available to this process.
 
+		*verbose* : a boolean
+			Whether to print the output of every run or not.
 
+		Returns
+		-------
+		A list holding, for each data file, whether its run was successful.
+		"""
+		if not self._check_exec():
+			return None
+		results = [None] * len(data_paths)
+		for i, successful, _ in self._run_many(data_paths, max_workers, verbose):
+			results[i] = successful
+		return results
 
+	def learn_batch(self, datasets, names=None, arities=None, max_workers=None, verbose=False):
+		"""
+		Learn a BN from each of many datasets, e.g. cross-validation
+		folds, running GOBNILP on up to *max_workers* of them at once
+		(see learn_many). All the data files are written up front.
 
+		Return a generator which yields an (index, BN) tuple for each
+		dataset as soon as its run finishes, where BN is the dict that
+		learn() returns, or None if the run failed - or return None
+		right away if GOBNILP has not been made.
 
+		Arguments
+		---------
+		*datasets* : a list of strings (data file paths) or datasets
+			All datasets should have the same kind of header, since
+			they share one settings file.
 
+		*names* : a list of strings (Optional)
+			The header of the datasets if it's not included.
 
+		*arities* : a list of integers (Optional)
+			The number of states of each variable - see write_data.
+			Pass them so that all datasets use the same arities even
+			if a state is missing from some of them.
 
+		*max_workers* : an integer (Optional)
+			The max number of GOBNILP processes to run at once.
+			Defaults to the number of cpus available to this process.
 
+		*verbose* : a boolean
+			Whether to print the output of every run or not.
+		"""
+		if not self._check_exec():
+			return None
+		data_paths = [data if isinstance(data, str)
+			else self.write_data(data, names, arities, _name='userdata_%d.dat' % i)
+			for i, data in enumerate(datasets)]
+		return ((i, self._parse_bn(output) if successful else None)
+			for i, successful, output in self._run_many(data_paths, max_workers, verbose))
 
+	def _run_many(self, data_paths, max_workers=None, verbose=False):
+		"""
+		Run GOBNILP on every data file in *data_paths*, at most
+		*max_workers* at a time, and yield an (index, successful,
+		output) tuple for each run as it finishes.
+		"""
+		if max_workers is None:
+			max_workers = _n_cpus()
+
+		self._flush_settings()
+
+		# one settings file per run, with its own output file names
+		settings_text = '\n'.join(self._settings_lines)
+		os.makedirs(self.DATA_DIR, exist_ok=True)
+		commands = []
+		for i, data_path in enumerate(data_paths):
+			def suffix(m):
+				root, ext = os.path.splitext(m.group(2))
+				return '%s%s_%d%s"' % (m.group(1), root, i, ext)
+			settings_path = os.path.join(self.DATA_DIR, 'settings_%d.txt' % i)
+			with open(settings_path, 'w') as f:
+				f.write(_OUTPUT_FILE.sub(suffix, settings_text))
+			commands.append([self._gob_exec_path, '-g=' + settings_path, '-f=dat', data_path])
+
+		log.info('Running GOBNILP Solver on %d datasets..', len(commands))
+		with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as ex:
+			# GOBNILP's stdout holds the learned BN
+			jobs = {ex.submit(self.execute, cmd, verbose=verbose, capture=True): i
+				for i, cmd in enumerate(commands)}
+			for job in concurrent.futures.as_completed(jobs):
+				i = jobs[job]
+				successful, output = job.result()
+				if not successful:
+					log.error('Solver run on %s was UNSUCCESSFUL for the following reason:\n%s',
+						data_paths[i], _text(output[-_OUTPUT_TAIL:]))
+				yield i, successful, output
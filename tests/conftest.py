@@ -0,0 +1,52 @@
+import os
+import shutil
+import stat
+
+import pytest
+
+from pyGOBN.pyGOBN import GOBN
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+SETTINGS = os.path.join(HERE, os.pardir, 'pyGOBN', 'mysettings.txt')
+
+# Stands in for the GOBNILP binary: logs each run next to itself and
+# prints a learned BN the way GOBNILP does.
+FAKE_GOBNILP = """#!/bin/sh
+echo run >> "$(dirname "$0")/runs.log"
+echo "a<- -1.5"
+echo "b<-a -2.25"
+echo "BN score is -3.75"
+"""
+
+
+@pytest.fixture
+def gobn(tmp_path):
+	"""
+	A GOBN object working in *tmp_path*, with a copy of the shipped
+	settings file and a fake GOBNILP binary (see runs).
+	"""
+	settings_file = str(tmp_path / 'mysettings.txt')
+	shutil.copy(SETTINGS, settings_file)
+	bin_dir = tmp_path / 'gobnilp1.6.1' / 'bin'
+	bin_dir.mkdir(parents=True)
+	exec_path = bin_dir / 'gobnilp'
+	exec_path.write_text(FAKE_GOBNILP)
+	exec_path.chmod(exec_path.stat().st_mode | stat.S_IXUSR)
+	return GOBN(str(tmp_path), SETTINGS_FILE=settings_file,
+		CONSTRAINTS_FILE=str(tmp_path / 'myconstraints.txt'))
+
+
+@pytest.fixture
+def runs(gobn):
+	"""
+	A function returning how many times the fake GOBNILP binary
+	of the gobn fixture has been run.
+	"""
+	log_path = os.path.join(gobn.GOBN.gobn_dir, 'bin', 'runs.log')
+
+	def count():
+		if not os.path.exists(log_path):
+			return 0
+		with open(log_path) as f:
+			return len(f.readlines())
+	return count
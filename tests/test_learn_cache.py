@@ -0,0 +1,47 @@
+import numpy as np
+
+DATA = np.array([[0, 1], [1, 0], [1, 1]])
+BN = {'a': ([], -1.5), 'b': (['a'], -2.25)}
+
+
+def test_identical_runs_are_cached(gobn, runs):
+	assert gobn.learn(DATA, names=['a', 'b'], verbose=False) == BN
+	assert gobn.learn(DATA, names=['a', 'b'], verbose=False) == BN
+	assert runs() == 1
+
+
+def test_use_cache_false_runs_again(gobn, runs):
+	gobn.learn(DATA, names=['a', 'b'], verbose=False)
+	gobn.learn(DATA, names=['a', 'b'], verbose=False, use_cache=False)
+	assert runs() == 2
+
+
+def test_changed_data_runs_again(gobn, runs):
+	gobn.learn(DATA, names=['a', 'b'], verbose=False)
+	gobn.learn(DATA[::-1], names=['a', 'b'], verbose=False)
+	assert runs() == 2
+
+
+def test_changed_settings_run_again(gobn, runs):
+	gobn.learn(DATA, names=['a', 'b'], verbose=False)
+	gobn.set_settings({'time': 5})
+	gobn.learn(DATA, names=['a', 'b'], verbose=False)
+	assert runs() == 2
+
+
+def test_settings_edited_by_hand_run_again(gobn, runs):
+	gobn.learn(DATA, names=['a', 'b'], verbose=False)
+	with open(gobn.SETTINGS_FILE) as f:
+		text = f.read()
+	with open(gobn.SETTINGS_FILE, 'w') as f:
+		f.write(text.replace('#gobnilp/scoring/palim = 5', 'gobnilp/scoring/palim = 2'))
+	gobn.learn(DATA, names=['a', 'b'], verbose=False)
+	assert runs() == 2
+
+
+def test_changed_constraints_run_again(gobn, runs):
+	gobn.learn(DATA, names=['a', 'b'], verbose=False)
+	with open(gobn.CONSTRAINTS_FILE, 'w') as f:
+		f.write('a<-b\n')
+	gobn.learn(DATA, names=['a', 'b'], verbose=False)
+	assert runs() == 2
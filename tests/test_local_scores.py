@@ -0,0 +1,79 @@
+import math
+
+import numpy as np
+import pandas as pd
+
+from pyGOBN.pyGOBN import _bdeu_score
+
+
+def read_jkl(path):
+	"""
+	Parse a local scores file into {variable: {parent set: score}}.
+	"""
+	with open(path) as f:
+		lines = f.read().split('\n')
+	n_vars = int(lines[0])
+	scores = {}
+	i = 1
+	for _ in range(n_vars):
+		name, n_sets = lines[i].split()
+		i += 1
+		scores[name] = {}
+		for _ in range(int(n_sets)):
+			fields = lines[i].split()
+			scores[name][frozenset(fields[2:])] = float(fields[0])
+			assert int(fields[1]) == len(fields) - 2
+			i += 1
+	return scores
+
+
+def test_bdeu_no_parents():
+	# r=2, q=1, alpha=1: G(2.5)/G(.5) * G(1.5)/G(.5) * G(1)/G(4) = 1/16
+	counts = np.array([2, 1])
+	assert math.isclose(_bdeu_score(counts, 1, 2, 1.0), math.log(1 / 16))
+
+
+def test_bdeu_one_parent():
+	# q=2 (rows: parent state, cols: child state) = [[2, 0], [0, 1]]
+	# parent state 0: G(2.25)/G(.25) * G(.5)/G(2.5) = 5/12
+	# parent state 1: G(1.25)/G(.25) * G(.5)/G(1.5) = 1/2
+	counts = np.array([2, 0, 0, 1])
+	assert math.isclose(_bdeu_score(counts, 2, 2, 1.0), math.log(5 / 24))
+
+
+def test_bdeu_scales_with_alpha():
+	# r=2, q=1, alpha=2: G(3)/G(1) * G(2)/G(1) * G(2)/G(5) = 1/12
+	counts = np.array([2, 1])
+	assert math.isclose(_bdeu_score(counts, 1, 2, 2.0), math.log(1 / 12))
+
+
+def test_dependent_parents_are_kept(gobn):
+	data = pd.DataFrame({'a': [0, 0, 1], 'b': [0, 0, 1]})
+	scores = read_jkl(gobn.compute_local_scores(data))
+	for child, parent in (('a', 'b'), ('b', 'a')):
+		assert math.isclose(scores[child][frozenset()], math.log(1 / 16))
+		assert math.isclose(scores[child][frozenset([parent])], math.log(5 / 24))
+
+
+def test_parent_sets_worse_than_a_subset_are_pruned(gobn):
+	# a and b are independent, so a parent only costs score:
+	# a|{} = log(9/384), a|{b} = log(1/144)
+	data = np.array([[0, 0], [1, 0], [0, 1], [1, 1]])
+	scores = read_jkl(gobn.compute_local_scores(data, names=['a', 'b']))
+	for child in ('a', 'b'):
+		assert list(scores[child]) == [frozenset()]
+		assert math.isclose(scores[child][frozenset()], math.log(9 / 384))
+
+
+def test_states_are_recoded(gobn):
+	# the same table as test_dependent_parents_are_kept, other state values
+	data = pd.DataFrame({'a': ['x', 'x', 'y'], 'b': [5, 5, -1]})
+	scores = read_jkl(gobn.compute_local_scores(data))
+	assert math.isclose(scores['a'][frozenset(['b'])], math.log(5 / 24))
+
+
+def test_scores_file_is_reused(gobn):
+	data = np.array([[0, 0], [1, 0], [0, 1], [1, 1]])
+	path = gobn.compute_local_scores(data)
+	assert gobn.compute_local_scores(data) == path
+	assert gobn.compute_local_scores(data, alpha=2.0) != path
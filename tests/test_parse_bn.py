@@ -0,0 +1,55 @@
+import logging
+
+# GOBNILP output with nbns = 2: SCIP's log, then each BN followed
+# by its score line.
+OUTPUT = b"""SCIP version 3.1.1 [precision: 8 byte] [memory: block] [mode: optimized]
+presolving:
+(round 1) 0 del vars, 0 del conss, 0 add conss, 0 chg bounds
+ time | node  | left  |LP iter|LP it/n| mem |mdpt |frac |vars |cons |cols |rows |cuts |confs|strbr|  dualbound   | primalbound  |  gap
+  0.0s|     1 |     0 |    12 |     - | 512k|   0 |   0 |  11 |  13 |  11 |  12 |   0 |   0 |   0 | -8.500000e+00 | -8.500000e+00 |   0.00%
+**************************************************
+Optimal Bayesian network:
+BN 1
+a<- -1.5
+b<-a -2.25
+c<-a,b -4.75
+BN score is -8.5
+BN 2
+a<-b -2.5
+b<- -1.25
+c<-a,b -4.75
+BN score is -8.5
+"""
+
+
+def test_first_bn_is_parsed(gobn):
+	assert gobn._parse_bn(OUTPUT) == {
+		'a': ([], -1.5),
+		'b': (['a'], -2.25),
+		'c': (['a', 'b'], -4.75)}
+
+
+def test_scientific_scores(gobn):
+	bn = gobn._parse_bn(b'a<- -1.5e+01\nb<-a -2E-1\nBN score is -15.2\n')
+	assert bn == {'a': ([], -15.0), 'b': (['a'], -0.2)}
+
+
+def test_no_bn_returns_none(gobn, caplog):
+	with caplog.at_level(logging.ERROR):
+		assert gobn._parse_bn(b'time limit reached\n') is None
+		assert gobn._parse_bn(b'BN score is -8.5\n') is None
+	assert 'No BN found' in caplog.text
+
+
+def test_truncated_output_is_returned_with_an_error(gobn, caplog):
+	with caplog.at_level(logging.ERROR):
+		bn = gobn._parse_bn(b'a<- -1.5\nb<-a -2.25\n')
+	assert bn == {'a': ([], -1.5), 'b': (['a'], -2.25)}
+	assert 'ended before the BN score line' in caplog.text
+
+
+def test_learn_returns_none_without_a_bn(gobn):
+	exec_path = gobn._gob_exec_path
+	with open(exec_path, 'w') as f:
+		f.write('#!/bin/sh\necho "time limit reached"\n')
+	assert gobn.learn([[0, 1], [1, 0]], names=['a', 'b'], verbose=False) is None
@@ -0,0 +1,110 @@
+import pytest
+
+
+def read(path):
+	with open(path) as f:
+		return f.read()
+
+
+def test_hand_edit_is_kept_by_later_flush(gobn):
+	gobn.set_settings({'time': 20})
+	gobn._flush_settings()
+	text = read(gobn.SETTINGS_FILE)
+	with open(gobn.SETTINGS_FILE, 'w') as f:
+		f.write(text.replace('limits/time = 20', 'limits/time = 999'))
+
+	gobn.set_settings({'alpha': 2})
+	gobn._flush_settings()
+	text = read(gobn.SETTINGS_FILE)
+	assert 'limits/time = 999' in text
+	assert 'gobnilp/scoring/alpha = 2' in text
+
+
+def test_same_settings_apply_again_after_hand_edit(gobn):
+	gobn.set_settings({'time': 20})
+	gobn._flush_settings()
+	text = read(gobn.SETTINGS_FILE)
+	with open(gobn.SETTINGS_FILE, 'w') as f:
+		f.write(text.replace('limits/time = 20', 'limits/time = 999'))
+
+	gobn.set_settings({'time': 20})
+	gobn._flush_settings()
+	assert 'limits/time = 20' in read(gobn.SETTINGS_FILE)
+
+
+def test_pending_settings_survive_hand_edit(gobn):
+	gobn.set_settings({'alpha': 2})
+	text = read(gobn.SETTINGS_FILE)
+	with open(gobn.SETTINGS_FILE, 'w') as f:
+		f.write(text.replace('limits/time = 20', 'limits/time = 999'))
+
+	gobn._flush_settings()
+	text = read(gobn.SETTINGS_FILE)
+	assert 'limits/time = 999' in text
+	assert 'gobnilp/scoring/alpha = 2' in text
+
+
+def test_new_settings_file_is_read(gobn, tmp_path):
+	gobn.set_settings({'alpha': 2})
+	gobn._flush_settings()
+	old_text = read(gobn.SETTINGS_FILE)
+
+	other = str(tmp_path / 'other.txt')
+	with open(other, 'w') as f:
+		f.write('limits/time = 5\n')
+	gobn.SETTINGS_FILE = other
+	gobn.set_settings({'gap': 1})
+	gobn._flush_settings()
+	text = read(other)
+	assert text.startswith('limits/time = 5\n')
+	assert 'limits/gap = 1' in text
+	assert 'alpha' not in text
+	assert read(str(tmp_path / 'mysettings.txt')) == old_text
+
+
+def test_round_trip(gobn):
+	original = read(gobn.SETTINGS_FILE).split('\n')
+	gobn.set_settings({
+		'time': 60, # set in the file
+		'nbns': 3, # commented out in the file
+		'solution': 'out/best.sol', # quoted string
+		'mergedelimiters': False, # boolean
+		'limits/nodes': 100}) # not in the file at all
+	# nothing is written until the solver runs
+	assert read(gobn.SETTINGS_FILE).split('\n') == original
+	gobn._flush_settings()
+
+	lines = read(gobn.SETTINGS_FILE).split('\n')
+	changed = {
+		'limits/time = 20': 'limits/time = 60',
+		'#gobnilp/nbns = 5': 'gobnilp/nbns = 3',
+		'gobnilp/outputfile/solution = "gobnilp/solutions/out.sol"':
+			'gobnilp/outputfile/solution = "out/best.sol"',
+		'gobnilp/mergedelimiters = TRUE': 'gobnilp/mergedelimiters = FALSE',
+		# defaults the file does not set
+		'#gobnilp/scoring/prune = FALSE': 'gobnilp/scoring/prune = TRUE',
+		'#gobnilp/scoring/fast = FALSE': 'gobnilp/scoring/fast = TRUE'}
+	assert lines[:len(original)] == [changed.get(line, line) for line in original]
+	assert lines[len(original):] == ['limits/nodes = 100']
+
+	# a new GOBN object reads the same values back
+	other = type(gobn)(gobn.GOBN.dir, SETTINGS_FILE=gobn.SETTINGS_FILE)
+	assert other._setting_value('limits/time') == '60'
+	assert other._setting_value('gobnilp/nbns') == '3'
+	assert other._setting_value('gobnilp/outputfile/solution') == 'out/best.sol'
+	assert other._setting_value('gobnilp/mergedelimiters') == 'FALSE'
+	assert other._setting_value('limits/nodes') == '100'
+	assert other._setting_value('limits/gap') is None
+	other._flush_settings()
+	assert read(gobn.SETTINGS_FILE).split('\n') == lines
+
+
+def test_unknown_setting_changes_nothing(gobn):
+	original = read(gobn.SETTINGS_FILE)
+	with pytest.raises(KeyError):
+		gobn.set_settings({'time': 60, 'tme': 60})
+	gobn._flush_settings()
+	# only the defaults were filled in
+	assert read(gobn.SETTINGS_FILE) == original \
+		.replace('#gobnilp/scoring/prune = FALSE', 'gobnilp/scoring/prune = TRUE') \
+		.replace('#gobnilp/scoring/fast = FALSE', 'gobnilp/scoring/fast = TRUE')